@@ -0,0 +1,56 @@
+"""Synthetic benchmark and regression check for auto-k selection.
+
+Times ``select_n_clusters`` on blob data with a known number of topics and
+checks that a selection cut short by the time budget is not cached.
+
+    uv run python benchmarks/bench_auto_k.py --n 3000 --centers 6
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.datasets import make_blobs
+
+from robotics_digest.clustering import clustering
+from robotics_digest.clustering.clustering import select_n_clusters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=3000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--centers", type=int, default=6)
+    parser.add_argument("--budget", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    X, _ = make_blobs(
+        n_samples=args.n, n_features=args.dim, centers=args.centers,
+        random_state=args.seed,
+    )
+    X = (X / np.linalg.norm(X, axis=1, keepdims=True)).astype(np.float32)
+    k_range = range(2, 17)
+
+    # An (almost) zero budget can't score every k, so nothing may be cached
+    key = ("bench", args.n, args.seed)
+    clustering._k_cache.clear()
+    select_n_clusters(X, k_range=k_range, time_budget_s=0.01, cache_key=key)
+    assert key not in clustering._k_cache, "partial selection was cached"
+
+    t0 = time.perf_counter()
+    full_k = select_n_clusters(X, k_range=k_range, time_budget_s=args.budget, cache_key=key)
+    full_s = time.perf_counter() - t0
+    assert clustering._k_cache.get(key) == full_k, "complete selection was not cached"
+
+    t0 = time.perf_counter()
+    cached_k = select_n_clusters(X, k_range=k_range, time_budget_s=args.budget, cache_key=key)
+    cached_s = time.perf_counter() - t0
+    assert cached_k == full_k
+
+    print(f"n={args.n} dim={args.dim} centers={args.centers} k_range={k_range.start}..{k_range.stop - 1}")
+    print(f"selection: k={full_k} in {full_s:.2f} s")
+    print(f"cached:    k={cached_k} in {cached_s * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
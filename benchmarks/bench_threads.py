@@ -0,0 +1,207 @@
+"""Synthetic benchmark: nested reply walks vs. the flat ThreadIndex.
+
+Builds threads with heavy-tailed sizes (most threads get a handful of
+replies, a few run to hundreds) and times two lookups both ways, after
+checking that both ways return the same answer:
+
+1. For each user, which roots they engaged with (replied in, reacted to,
+   or were mentioned in).
+2. ``user_interest_vector`` over the whole message list.
+
+    uv run python benchmarks/bench_threads.py --roots 20000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+
+from robotics_digest.digest.digest import user_interest_vector
+from robotics_digest.models.models import Message, User
+from robotics_digest.threads.threads import (
+    ThreadIndex,
+    build_thread_index,
+    flatten_threads,
+)
+
+
+def thread_size(rng: random.Random, max_replies: int) -> int:
+    # Pareto tail: median ~1-2 replies, occasional very deep threads
+    if rng.random() < 0.4:
+        return 0
+    return min(max_replies, int(rng.paretovariate(1.2)))
+
+
+def make_threads(n_roots: int, users: List[User], max_replies: int, seed: int) -> List[Message]:
+    rng = random.Random(seed)
+    user_ids = [u.id for u in users]
+    base_ts = datetime(2025, 1, 1, 9, 0, 0)
+    roots: List[Message] = []
+    msg_id = 0
+
+    def make(ts: datetime) -> Message:
+        nonlocal msg_id
+        author = rng.choice(user_ids)
+        others = [u for u in rng.sample(user_ids, k=4) if u != author]
+        msg = Message(
+            id=f"M{msg_id}",
+            ts=ts,
+            author_id=author,
+            project_id="P1",
+            channel="#proj-p1",
+            text="Synced on latest test results and next steps.",
+            mentions=others[:rng.randint(0, 2)],
+            reacting_users={"thumbsup": others[2:]} if rng.random() < 0.1 else {},
+        )
+        msg_id += 1
+        return msg
+
+    # Two minutes per root so the data spans past the 14-day lookback
+    for r in range(n_roots):
+        root = make(base_ts + timedelta(minutes=2 * r))
+        k = thread_size(rng, max_replies)
+        root.replies = [make(root.ts + timedelta(seconds=j + 1)) for j in range(k)]
+        root.reply_count = k
+        roots.append(root)
+    return roots
+
+
+def nested_engaged_roots(roots: List[Message], user_ids: List[str]) -> List[List[str]]:
+    out = []
+    for uid in user_ids:
+        ids = []
+        for msg in roots:
+            if (
+                any(r.author_id == uid for r in msg.replies)
+                or any(uid in v for v in msg.reacting_users.values())
+                or uid in msg.mentions
+            ):
+                ids.append(msg.id)
+        out.append(ids)
+    return out
+
+
+def index_engaged_roots(index: ThreadIndex, user_ids: List[str]) -> List[np.ndarray]:
+    is_root = index.root_row < 0
+    out = []
+    for uid in user_ids:
+        on_root = np.union1d(index.reacted(uid), index.mentioned(uid))
+        out.append(np.union1d(index.replied(uid), on_root[is_root[on_root]]))
+    return out
+
+
+def nested_user_interest_vector(
+    user: User,
+    messages: List[Message],
+    embeddings: np.ndarray,
+    lookback_days: int = 14,
+) -> np.ndarray:
+    """The pre-index object walk, with the same weighting as the index version."""
+    cutoff_ts = messages[0].ts + timedelta(days=lookback_days)
+    weighted_embs = np.zeros(embeddings.shape[1])
+    total_weight = 0.0
+    for i, msg in enumerate(messages):
+        if msg.ts > cutoff_ts:
+            continue
+        if msg.author_id == user.id:
+            weight = 3.0
+        elif any(r.author_id == user.id for r in msg.replies):
+            weight = 2.0
+        elif any(user.id in reactors for reactors in msg.reacting_users.values()):
+            weight = 1.5
+        elif (
+            user.id in msg.mentions
+            or f"@{user.id}" in msg.text
+            or user.name.lower() in msg.text.lower()
+        ):
+            weight = 1.0
+        else:
+            continue
+        days_old = (cutoff_ts - msg.ts).days
+        weight *= max(0.1, 1.0 - (days_old / lookback_days) * 0.9)
+        weighted_embs += weight * embeddings[i]
+        total_weight += weight
+    if total_weight == 0:
+        return np.zeros(embeddings.shape[1])
+    return weighted_embs / total_weight
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--roots", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--max-replies", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--vector-users", type=int, default=10,
+                        help="users to time user_interest_vector for")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    users = [User(id=f"U{i}", name=f"Name{i:04d}", role="ME") for i in range(args.users)]
+    user_ids = [u.id for u in users]
+    roots = make_threads(args.roots, users, args.max_replies, args.seed)
+
+    t0 = time.perf_counter()
+    flat = flatten_threads(roots)
+    index = build_thread_index(flat, users)
+    build_s = time.perf_counter() - t0
+
+    rng = np.random.default_rng(args.seed)
+    embeddings = rng.standard_normal((len(flat), args.dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    sizes = np.diff(index.reply_ptr)
+    sizes = sizes[sizes > 0]
+    nbytes = (
+        index.ts.nbytes + index.root_row.nbytes
+        + index.reply_ptr.nbytes + index.reply_rows.nbytes
+        + sum(a.nbytes for d in (
+            index.author_rows, index.replied_roots,
+            index.reacted_rows, index.mentioned_rows,
+        ) for a in d.values())
+    )
+    print(f"messages={len(flat)} roots={len(roots)} threads={sizes.size} "
+          f"mean_replies={sizes.mean():.1f} max_replies={sizes.max()}")
+    print(f"index build: {build_s * 1e3:.1f} ms, arrays {nbytes / 1e6:.2f} MB")
+
+    # 1. Engaged roots per user
+    row_by_id = {m.id: i for i, m in enumerate(flat)}
+    nested, nested_s = timed(nested_engaged_roots, roots, user_ids)
+    indexed, index_s = timed(index_engaged_roots, index, user_ids)
+    for uid, ids, rows in zip(user_ids, nested, indexed):
+        expected = np.sort(np.array([row_by_id[i] for i in ids], dtype=np.int64))
+        assert np.array_equal(expected, rows), f"engaged roots differ for {uid}"
+    hits = sum(len(ids) for ids in nested)
+    print(f"\nengaged roots ({len(user_ids)} users, {hits} hits)")
+    print(f"  nested walk: {nested_s * 1e3:.1f} ms")
+    print(f"  index:       {index_s * 1e3:.1f} ms")
+    print(f"  speedup:     {nested_s / index_s:.1f}x")
+
+    # 2. user_interest_vector
+    sample = users[:args.vector_users]
+    nested_s = index_s = 0.0
+    for user in sample:
+        old, dt_old = timed(nested_user_interest_vector, user, flat, embeddings)
+        new, dt_new = timed(
+            lambda u: user_interest_vector(u, flat, embeddings, thread_index=index),
+            user,
+        )
+        assert np.allclose(old, new), f"interest vectors differ for {user.id}"
+        nested_s += dt_old
+        index_s += dt_new
+    print(f"\nuser_interest_vector ({len(sample)} users)")
+    print(f"  nested walk: {nested_s * 1e3:.1f} ms")
+    print(f"  index:       {index_s * 1e3:.1f} ms")
+    print(f"  speedup:     {nested_s / index_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,216 @@
 # robotics_digest/clustering.py
-from collections import defaultdict
+import multiprocessing
+import os
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
 
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from threadpoolctl import threadpool_limits
 
 from ..models.models import Message
 
+NClusters = int | Literal["auto"]
+
+# (window key) -> chosen k, so repeated runs over the same window skip selection.
+# Process-local: it only pays off for long-lived callers that re-cluster the
+# same window, not for a one-shot daily run in a fresh process.
+_k_cache: "OrderedDict[Tuple, int]" = OrderedDict()
+_K_CACHE_SIZE = 256
+
+# Set once per worker process by _init_worker so each task only ships its k
+_worker_embeddings: Optional[np.ndarray] = None
+
+
+@dataclass
+class AutoKOptions:
+    """Knobs for ``n_clusters="auto"``; ``k_range=None`` uses the caller's default.
+
+    ``n_jobs`` follows scikit-learn: ``None`` uses up to one process per core,
+    ``-1`` all cores, ``-2`` all but one, and so on.
+    """
+
+    k_range: Optional[Sequence[int]] = None
+    metric: Literal["silhouette", "davies_bouldin"] = "silhouette"
+    sample_size: int = 1000
+    time_budget_s: float = 10.0
+    n_jobs: Optional[int] = None
+
+
+def _init_worker(embeddings: np.ndarray) -> None:
+    global _worker_embeddings
+    _worker_embeddings = embeddings
+
+
+def _score_k(
+    k: int,
+    metric: str,
+    sample_size: int,
+    random_state: int,
+) -> Tuple[int, float]:
+    """Fit a bounded mini-batch k-means for one k and score it on a subsample.
+
+    Runs in a worker process. Native BLAS/OpenMP pools are limited to one
+    thread so n_jobs workers use n_jobs cores rather than n_jobs * cpu_count.
+    Scores are oriented so that higher is better for both metrics.
+    """
+    embeddings = _worker_embeddings
+    with threadpool_limits(limits=1):
+        kmeans = MiniBatchKMeans(
+            n_clusters=k,
+            batch_size=1024,
+            n_init=3,
+            max_iter=50,
+            max_no_improvement=5,
+            random_state=random_state,
+        )
+        labels = kmeans.fit_predict(embeddings)
+        if len(set(labels.tolist())) < 2:
+            return k, float("-inf")
+
+        n = len(embeddings)
+        if n > sample_size:
+            rng = np.random.default_rng(random_state)
+            sample = rng.choice(n, size=sample_size, replace=False)
+            X, y = embeddings[sample], labels[sample]
+            if len(set(y.tolist())) < 2:
+                return k, float("-inf")
+        else:
+            X, y = embeddings, labels
+
+        if metric == "davies_bouldin":
+            return k, -float(davies_bouldin_score(X, y))
+        return k, float(silhouette_score(X, y, metric="cosine"))
+
+
+def select_n_clusters(
+    embeddings: np.ndarray,
+    k_range: Sequence[int] = range(4, 17),
+    metric: Literal["silhouette", "davies_bouldin"] = "silhouette",
+    sample_size: int = 1000,
+    time_budget_s: float = 10.0,
+    n_jobs: Optional[int] = None,
+    cache_key: Optional[Tuple] = None,
+    random_state: int = 42,
+) -> int:
+    """Pick the number of clusters by scoring each k in ``k_range`` in parallel.
+
+    Each candidate is fit in a worker process with a bounded MiniBatchKMeans
+    and scored with a subsampled silhouette (or Davies-Bouldin) so the metric
+    stays O(sample_size^2) instead of O(n^2). When ``time_budget_s`` expires
+    the pool is terminated, killing any fit still running, and the best
+    finished k wins; if none finished, the middle of the range is used.
+    Only a complete selection (every k scored) is cached under ``cache_key``
+    (process-local LRU, ``_K_CACHE_SIZE`` entries); a pick made under time
+    pressure is returned but not stored, so a later call can do better.
+    """
+    if metric not in ("silhouette", "davies_bouldin"):
+        raise ValueError(f"Unknown metric {metric!r}")
+    if cache_key is not None and cache_key in _k_cache:
+        _k_cache.move_to_end(cache_key)
+        return _k_cache[cache_key]
+
+    n = len(embeddings)
+    ks = [k for k in k_range if 2 <= k < n]
+    if not ks:
+        return max(1, min(n, min(k_range, default=1)))
+
+    cpus = os.cpu_count() or 1
+    if n_jobs is None:
+        workers = min(len(ks), cpus)
+    elif n_jobs < 0:
+        workers = cpus + 1 + n_jobs
+    else:
+        workers = n_jobs
+    if workers < 1:
+        raise ValueError(f"n_jobs={n_jobs} leaves no workers on {cpus} CPUs")
+    deadline = time.monotonic() + time_budget_s
+    scores: Dict[int, float] = {}
+
+    pool = multiprocessing.Pool(
+        processes=workers, initializer=_init_worker, initargs=(embeddings,)
+    )
+    try:
+        pending = [
+            pool.apply_async(_score_k, (k, metric, sample_size, random_state))
+            for k in ks
+        ]
+        for res in pending:
+            res.wait(max(0.0, deadline - time.monotonic()))
+        for res in pending:
+            if res.ready() and res.successful():
+                k, score = res.get()
+                scores[k] = score
+    finally:
+        # Hard stop: stragglers are killed, not left running in the background
+        pool.terminate()
+        pool.join()
+
+    if scores:
+        # Ties go to the smaller k
+        best_k = max(scores, key=lambda k: (scores[k], -k))
+    else:
+        best_k = ks[len(ks) // 2]
+
+    if cache_key is not None and len(scores) == len(ks):
+        _k_cache[cache_key] = best_k
+        if len(_k_cache) > _K_CACHE_SIZE:
+            _k_cache.popitem(last=False)
+    return best_k
+
+
+def _resolve_n_clusters(
+    n_clusters: NClusters,
+    messages: List[Message],
+    embeddings: np.ndarray,
+    default_k_range: Sequence[int],
+    auto_k: Optional[AutoKOptions],
+) -> int:
+    if isinstance(n_clusters, str):
+        if n_clusters != "auto":
+            raise ValueError(f"n_clusters must be an int or 'auto', got {n_clusters!r}")
+    else:
+        return n_clusters
+
+    opts = auto_k or AutoKOptions()
+    k_range = tuple(opts.k_range if opts.k_range is not None else default_k_range)
+    # Identify the window by its contents, plus everything that affects the pick
+    cache_key = (
+        messages[0].id,
+        messages[-1].id,
+        len(messages),
+        k_range,
+        opts.metric,
+        opts.sample_size,
+    )
+    return select_n_clusters(
+        embeddings,
+        k_range=k_range,
+        metric=opts.metric,
+        sample_size=opts.sample_size,
+        time_budget_s=opts.time_budget_s,
+        n_jobs=opts.n_jobs,
+        cache_key=cache_key,
+    )
+
 
 def cluster_relevant_period(
     messages: List[Message], 
     embeddings: np.ndarray, 
     start_day: int, 
     days: int = 14, 
-    n_clusters: int = 12
+    n_clusters: NClusters = 12,
+    auto_k: Optional[AutoKOptions] = None,
 ) -> Dict[int, List[int]]:
-    """Cluster messages over 14-day window to find stable topics."""
+    """Cluster messages over 14-day window to find stable topics.
+
+    Pass ``n_clusters="auto"`` to choose k per window with ``select_n_clusters``,
+    tuned by ``auto_k``.
+    """
     base_ts = messages[0].ts
     window_idxs = [
         i for i, m in enumerate(messages)
@@ -26,9 +220,17 @@ def cluster_relevant_period(
     if len(window_idxs) < 50:  # Need enough data
         return {}
     
+    window_msgs = [messages[i] for i in window_idxs]
     window_embs = embeddings[window_idxs]
+    n_clusters = _resolve_n_clusters(
+        n_clusters,
+        window_msgs,
+        window_embs,
+        default_k_range=range(6, 21),
+        auto_k=auto_k,
+    )
     clusters = cluster_messages(
-        [messages[i] for i in window_idxs], 
+        window_msgs, 
         window_embs, 
         n_clusters=n_clusters
     )
@@ -53,13 +255,21 @@ def cluster_for_day(
     day: int,
     messages: List[Message],
     embeddings: np.ndarray,
-    n_clusters: int = 6,
+    n_clusters: NClusters = 6,
+    auto_k: Optional[AutoKOptions] = None,
 ) -> List[int]:
     idxs = day_filter(messages, day)
     if not idxs:
         return []
     day_msgs = [messages[i] for i in idxs]
     day_embs = embeddings[idxs, :]
+    n_clusters = _resolve_n_clusters(
+        n_clusters,
+        day_msgs,
+        day_embs,
+        default_k_range=range(3, 11),
+        auto_k=auto_k,
+    )
     clusters = cluster_messages(day_msgs, day_embs, n_clusters=n_clusters)
     rep_local = select_representatives(day_msgs, day_embs, clusters)
     return [idxs[i] for i in rep_local]  # map back to global indices
@@ -1,19 +1,26 @@
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import ollama
 
 from ..fake_data.fake_data import current_phase
 from ..models.models import Message, Project, User, UserFocus
+from ..threads.threads import (
+    US_PER_DAY,
+    ThreadIndex,
+    build_thread_index,
+    to_epoch_us,
+)
 
 
 def user_interest_vector(
     user: User, 
     messages: List[Message], 
     embeddings: np.ndarray,
-    lookback_days: int = 14
+    lookback_days: int = 14,
+    thread_index: Optional[ThreadIndex] = None,
 ) -> np.ndarray:
     """
         Compute user's interest vector from:
@@ -21,62 +28,51 @@ def user_interest_vector(
             2. Messages they REPLIED to (weight: 2.0)  
             3. Messages they REACTED to (weight: 1.5)
             4. Messages that MENTION them (weight: 1.0)
+
+        Pass a prebuilt ``thread_index`` to avoid rebuilding it per user.
     """
+    if thread_index is None:
+        thread_index = build_thread_index(messages, [user])
+    if not len(thread_index) == len(messages) == embeddings.shape[0]:
+        raise ValueError(
+            f"thread_index ({len(thread_index)} rows), messages ({len(messages)}) "
+            f"and embeddings ({embeddings.shape[0]}) must be built from the same list"
+        )
+
     base_ts = messages[0].ts  # assume sorted
-    cutoff_ts = base_ts + timedelta(days=lookback_days)
-    
-    engagement_idxs: List[tuple[float, int]] = []
-    
-    for i, msg in enumerate(messages):
-        if msg.ts > cutoff_ts:
-            continue  # too old
-            
-        weight = 0.0
-        
-        # 1. Messages they authored (strongest signal)
-        if msg.author_id == user.id:
-            weight += 3.0
-            
-        # 2. Messages they replied to (we'd need thread_root_id matching)
-        elif msg.thread_root_id and any(r.author_id == user.id for r in msg.replies):
-            weight += 2.0
-            
-        # 3. Messages they reacted to (need reactions field to include user IDs)
-        elif msg.reacting_users and any(user.id in reactors for reactors in msg.reacting_users.values()):
-            weight += 1.5
-            
-        # 4. Messages mentioning them (need @mentions parsing)
-        elif f"@{user.id}" in msg.text or user.name.lower() in msg.text.lower():
-            weight += 1.0
-            
-        # Fresh engagement matters more
-        days_old = (cutoff_ts - msg.ts).days
-        freshness_weight = max(0.1, 1.0 - (days_old / lookback_days) * 0.9)
-        final_weight = weight * freshness_weight
-        if final_weight > 0:
-            engagement_idxs.append((final_weight, i))
-    
-    if not engagement_idxs:
+    cutoff_us = to_epoch_us(base_ts + timedelta(days=lookback_days))
+
+    # Strongest signal wins: later assignments overwrite weaker ones
+    weights = np.zeros(len(thread_index))
+    weights[thread_index.mentioned(user.id)] = 1.0
+    weights[thread_index.reacted(user.id)] = 1.5
+    weights[thread_index.replied(user.id)] = 2.0
+    weights[thread_index.authored(user.id)] = 3.0
+
+    # Fresh engagement matters more
+    days_old = (cutoff_us - thread_index.ts) // US_PER_DAY
+    freshness = np.maximum(0.1, 1.0 - (days_old / lookback_days) * 0.9)
+    weights *= np.where(thread_index.ts > cutoff_us, 0.0, freshness)
+
+    engaged = np.flatnonzero(weights)
+    if engaged.size == 0:
         return np.zeros(embeddings.shape[1])
-    
+
     # Weighted average of engaged message embeddings
-    weighted_embs = np.zeros(embeddings.shape[1])
-    total_weight = 0.0
-    
-    for weight, idx in engagement_idxs:
-        weighted_embs += weight * embeddings[idx]
-        total_weight += weight
-    
-    return weighted_embs / total_weight
+    w = weights[engaged]
+    return (w @ embeddings[engaged]) / w.sum()
 
 def get_user_top_clusters(
     user: User, 
     clusters: Dict[int, List[int]],  # cluster indexes to message indexes
     messages: List[Message], 
-    embeddings: np.ndarray
+    embeddings: np.ndarray,
+    thread_index: Optional[ThreadIndex] = None,
 ) -> List[int]:
     """Rank clusters by similarity to user's interest vector."""
-    user_vec = user_interest_vector(user, messages, embeddings)
+    user_vec = user_interest_vector(
+        user, messages, embeddings, thread_index=thread_index
+    )
     
     cluster_scores = []
     for cid, msg_idxs in clusters.items():
@@ -124,6 +120,7 @@ def build_digest_for_user(
     embeddings,  # ndarray, unused directly here but available if you want similarity
     focus_idx: Dict[tuple, UserFocus],
     max_items: int = 15,
+    thread_index: Optional[ThreadIndex] = None,
 ) -> str:
     base = datetime(2025, 1, 1)
     focus = focus_idx.get((user.id, day))
@@ -133,7 +130,9 @@ def build_digest_for_user(
     proj_by_id = {p.id: p for p in projects}
 
     # get top clusters for this user
-    top_clusters = get_user_top_clusters(user, clusters, messages, embeddings)
+    top_clusters = get_user_top_clusters(
+        user, clusters, messages, embeddings, thread_index=thread_index
+    )
 
     # Candidate messages: same day + in focused projects
     candidates: List[Tuple] = []
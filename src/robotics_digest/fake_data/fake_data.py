@@ -93,19 +93,30 @@ def generate_messages(
     projects: List[Project],
     days: int = 30,
     msgs_per_day: int = 80,
+    reply_prob: float = 0.3,
 ) -> List[Message]:
     base_ts = datetime(2025, 1, 1, 9, 0, 0)
     msgs: List[Message] = []
     msg_id = 0
 
     for day in range(days):
+        day_roots: List[Message] = []
         for _ in range(msgs_per_day):
             user = RNG.choice(users)
             project = RNG.choice(projects)
+            ts = base_ts + timedelta(days=day, minutes=RNG.randint(0, 8 * 60))
+
+            # Some messages are replies to an earlier thread from the same day
+            root = None
+            if day_roots and RNG.random() < reply_prob:
+                root = RNG.choice(day_roots)
+                project = next(p for p in projects if p.id == root.project_id)
+                ts = root.ts + timedelta(minutes=RNG.randint(1, 120))
+                root.reply_count += 1
+
             phase = current_phase(project, day)
             text, is_decision, is_risk, is_blocker = sample_message_text(user.role, phase)
 
-            ts = base_ts + timedelta(days=day, minutes=RNG.randint(0, 8 * 60))
             reactions = []
             if is_decision or is_risk or is_blocker:
                 reactions = ["thumbsup", "fire"]
@@ -122,8 +133,11 @@ def generate_messages(
                     is_decision=is_decision,
                     is_risk=is_risk,
                     is_blocker=is_blocker,
+                    thread_root_id=root.id if root else None,
                 )
             )
+            if root is None:
+                day_roots.append(msgs[-1])
             msg_id += 1
             for msg in msgs:
                 # Add realistic engagement
@@ -135,4 +149,6 @@ def generate_messages(
                     reactors = random.sample([u.id for u in users if u.id != msg.author_id], 
                                         k=random.randint(1, 3))
                     msg.reacting_users["thumbsup"] = reactors
+    # Replies can land after later roots; keep the list ts-sorted for callers
+    msgs.sort(key=lambda m: m.ts)
     return msgs
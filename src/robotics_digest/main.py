@@ -8,6 +8,7 @@ from .fake_data.fake_data import (
     generate_user_focus,
     generate_users,
 )
+from .threads.threads import build_thread_index
 from .vector_store.vector_store import MessageVectorStore
 
 
@@ -23,15 +24,17 @@ def build_index():
     #store.reset()
     store.add_messages(messages, embeddings)
 
-    return users, projects, messages, embeddings, store
+    thread_index = build_thread_index(messages, users)
+
+    return users, projects, messages, embeddings, store, thread_index
 
 
 def run_demo(day: int = 18):
     """Run demo for specific day."""
     print(f"🤖 Generating demo for day {day}...")
     
-    users, projects, messages, embeddings, store = build_index()
-    clusters = cluster_relevant_period(messages, embeddings, day)
+    users, projects, messages, embeddings, store, thread_index = build_index()
+    clusters = cluster_relevant_period(messages, embeddings, day, n_clusters="auto")
     focus_list = generate_user_focus(users, projects)
     focus_idx = build_focus_index(focus_list)
     
@@ -48,6 +51,7 @@ def run_demo(day: int = 18):
             embeddings=embeddings,
             focus_idx=focus_idx,
             max_items=8,
+            thread_index=thread_index,
         )
         print(f"\n{'='*80}")
         print(f"DIGEST #{i+1} for {user.name} ({user.role})")
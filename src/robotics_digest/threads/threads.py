@@ -0,0 +1,165 @@
+# robotics_digest/threads.py
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..models.models import Message, User
+
+_MENTION_RE = re.compile(r"@(\w+)")
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+# Naive epoch: ts arithmetic stays in wall-clock time like timedelta.days,
+# unaffected by the local timezone or DST
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+US_PER_DAY = 86_400_000_000
+
+
+def to_epoch_us(ts: datetime) -> int:
+    """Microseconds since a naive 1970-01-01, exact for naive datetimes."""
+    return (ts - _EPOCH) // _US
+
+
+@dataclass
+class ThreadIndex:
+    """Flat engagement index over a message list, built once at ingest.
+
+    Rows are positions in the ``messages`` list the index was built from.
+    Threads are stored CSR-style: the replies of root row ``r`` are
+    ``reply_rows[reply_ptr[r]:reply_ptr[r + 1]]``. Per-user postings are
+    sorted int32 row arrays, so engagement lookups are array/set operations
+    instead of walks over nested ``Message.replies``.
+    """
+
+    ts: np.ndarray                 # int64 naive-epoch microseconds per row
+    author_rows: Dict[str, np.ndarray]
+    root_row: np.ndarray           # int32 per row, -1 for non-thread messages
+    reply_ptr: np.ndarray          # int32, len(messages) + 1
+    reply_rows: np.ndarray         # int32, all replies grouped by root
+    replied_roots: Dict[str, np.ndarray] = field(default_factory=dict)
+    reacted_rows: Dict[str, np.ndarray] = field(default_factory=dict)
+    mentioned_rows: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def replies_of(self, row: int) -> np.ndarray:
+        return self.reply_rows[self.reply_ptr[row]:self.reply_ptr[row + 1]]
+
+    def authored(self, user_id: str) -> np.ndarray:
+        return self.author_rows.get(user_id, _EMPTY)
+
+    def replied(self, user_id: str) -> np.ndarray:
+        return self.replied_roots.get(user_id, _EMPTY)
+
+    def reacted(self, user_id: str) -> np.ndarray:
+        return self.reacted_rows.get(user_id, _EMPTY)
+
+    def mentioned(self, user_id: str) -> np.ndarray:
+        return self.mentioned_rows.get(user_id, _EMPTY)
+
+
+def flatten_threads(messages: Iterable[Message]) -> List[Message]:
+    """Expand nested ``replies`` into a flat, ts-sorted list.
+
+    Replies without a ``thread_root_id`` come back as copies tagged with their
+    root's id, so the thread survives without the nested objects; the
+    caller's messages are not modified. Messages already present by id are
+    not duplicated. The result can go straight into ``build_thread_index``.
+    """
+    flat: List[Message] = []
+    seen = set()
+    stack = list(reversed(list(messages)))
+    while stack:
+        msg = stack.pop()
+        if msg.id in seen:
+            continue
+        seen.add(msg.id)
+        flat.append(msg)
+        root_id = msg.thread_root_id or msg.id
+        for reply in reversed(msg.replies):
+            if reply.thread_root_id is None:
+                reply = reply.model_copy(update={"thread_root_id": root_id})
+            stack.append(reply)
+    # Stable: ties keep roots ahead of their replies
+    flat.sort(key=lambda m: m.ts)
+    return flat
+
+
+def _postings(groups: Dict[str, List[int]]) -> Dict[str, np.ndarray]:
+    return {
+        key: np.unique(np.asarray(rows, dtype=np.int32))
+        for key, rows in groups.items()
+    }
+
+
+def build_thread_index(
+    messages: List[Message],
+    users: Optional[List[User]] = None,
+) -> ThreadIndex:
+    """Build a ``ThreadIndex`` over a flat, ts-sorted message list.
+
+    Replies are linked to their root through ``thread_root_id``; a root that
+    is not in ``messages`` leaves its replies unlinked. Mentions come from
+    ``Message.mentions`` and ``@U1`` tokens in the text, plus case-insensitive
+    name matches when ``users`` is given.
+    """
+    n = len(messages)
+    row_by_id = {m.id: i for i, m in enumerate(messages)}
+
+    ts = np.fromiter((to_epoch_us(m.ts) for m in messages), dtype=np.int64, count=n)
+    root_row = np.full(n, -1, dtype=np.int32)
+
+    authors: Dict[str, List[int]] = defaultdict(list)
+    replied: Dict[str, List[int]] = defaultdict(list)
+    reacted: Dict[str, List[int]] = defaultdict(list)
+    mentioned: Dict[str, List[int]] = defaultdict(list)
+    names = [(u.id, u.name.lower()) for u in users] if users else []
+
+    for i, m in enumerate(messages):
+        authors[m.author_id].append(i)
+
+        if m.thread_root_id is not None and m.thread_root_id != m.id:
+            r = row_by_id.get(m.thread_root_id, -1)
+            if r >= 0:
+                root_row[i] = r
+                replied[m.author_id].append(r)
+
+        for reactors in m.reacting_users.values():
+            for uid in reactors:
+                reacted[uid].append(i)
+
+        for uid in m.mentions:
+            mentioned[uid].append(i)
+        for uid in _MENTION_RE.findall(m.text):
+            mentioned[uid].append(i)
+        if names:
+            lowered = m.text.lower()
+            for uid, name in names:
+                if name in lowered:
+                    mentioned[uid].append(i)
+
+    # CSR root -> replies: stable sort keeps replies in ts order per root
+    reply_mask = root_row >= 0
+    reply_idx = np.flatnonzero(reply_mask).astype(np.int32)
+    order = np.argsort(root_row[reply_idx], kind="stable")
+    reply_rows = reply_idx[order]
+    counts = np.bincount(root_row[reply_idx], minlength=n)
+    reply_ptr = np.zeros(n + 1, dtype=np.int32)
+    reply_ptr[1:] = np.cumsum(counts)
+
+    return ThreadIndex(
+        ts=ts,
+        author_rows=_postings(authors),
+        root_row=root_row,
+        reply_ptr=reply_ptr,
+        reply_rows=reply_rows,
+        replied_roots=_postings(replied),
+        reacted_rows=_postings(reacted),
+        mentioned_rows=_postings(mentioned),
+    )